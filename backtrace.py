@@ -1,183 +1,362 @@
 import sys
 import os
+import io
+import re
+import atexit
 import functools
-from typing import Optional, Callable, Any
-from rich.console import Console
-from rich.tree import Tree
-from rich.panel import Panel
+import threading
+import weakref
+from array import array
+from typing import TYPE_CHECKING, Optional, Callable, Any, TextIO
+
+if TYPE_CHECKING:
+    from rich.console import Console
+    from rich.text import Text
 
 _cwd = os.getcwd()
-_backtrace_file = os.path.abspath(__file__)
-_console = Console()
+_CWD_PREFIX = os.path.join(_cwd, '')
+_PREFIX_DIR = os.path.join(sys.prefix, '')
+# Installed third-party packages, wherever the environment lives.
+_find_package_dir = re.compile(r'site-packages|dist-packages').search
+# Compared against co_filename, which the import system sets from the same
+# path as __file__.
+_backtrace_file = __file__
+# rich is imported on first use so plain-text traces never load it.
+_console: Optional["Console"] = None
+
+# code -> (co_filename, rel_path, func_name). Weakly keyed so traced code
+# can still be freed; co_filename is kept because code equality ignores it.
+_code_info_cache: "weakref.WeakKeyDictionary[Any, tuple[str, str, str]]" = weakref.WeakKeyDictionary()
+
+# Event kinds as stored in _TraceContext._ev_kind.
+_CALL, _RETURN, _EXCEPTION = 0, 1, 2
+
+
+class _LogFileRegistry:
+    # One append handle per log file, shared by every trace and warning that
+    # writes there. Each handle has its own lock so entries from different
+    # threads can't interleave; writers flush after each entry so nothing is
+    # lost if the process dies. The handles are closed at interpreter exit.
+    _handles: dict[str, tuple[TextIO, threading.Lock]] = {}
+    _handles_lock = threading.Lock()
+    
+    @classmethod
+    def get(cls, log_file: str) -> tuple[TextIO, threading.Lock]:
+        path = os.path.abspath(log_file)
+        entry = cls._handles.get(path)
+        if entry is None:
+            with cls._handles_lock:
+                entry = cls._handles.get(path)
+                if entry is None:
+                    entry = cls._handles[path] = (open(path, 'a', buffering=-1), threading.Lock())
+        return entry
+    
+    @classmethod
+    def write_entry(cls, log_file: str, text: str) -> None:
+        handle, lock = cls.get(log_file)
+        with lock:
+            handle.write(text)
+            handle.flush()
+    
+    @classmethod
+    def close_all(cls) -> None:
+        with cls._handles_lock:
+            for handle, lock in cls._handles.values():
+                with lock:
+                    handle.close()
+            cls._handles.clear()
+
+
+atexit.register(_LogFileRegistry.close_all)
+
+
+def _untraced(func: Callable, *args) -> Any:
+    # Runs func with tracing suspended, so an enclosing trace doesn't record
+    # rich's imports and rendering as part of the user's calls.
+    old_trace = sys.gettrace()
+    sys.settrace(None)
+    try:
+        return func(*args)
+    finally:
+        sys.settrace(old_trace)
+
+
+def _new_console() -> "Console":
+    from rich.console import Console
+    # Loaded together with the console so the imports in the formatting
+    # code are plain sys.modules hits.
+    import rich.panel
+    import rich.text
+    return Console()
+
+
+def _get_console() -> "Console":
+    global _console
+    if _console is None:
+        _console = _untraced(_new_console)
+    return _console
 
 
 def _get_relative_path(filepath: str) -> str:
+    if filepath.startswith(_CWD_PREFIX):
+        return filepath[len(_CWD_PREFIX):]
     try:
         return os.path.relpath(filepath, _cwd)
     except ValueError:
         return filepath
 
 
-def _get_function_name(frame) -> str:
-    code = frame.f_code
-    func_name = code.co_name
-    
-    if func_name == '<module>':
-        local_vars = frame.f_locals
-        for name, value in local_vars.items():
-            if callable(value) and hasattr(value, '__code__') and value.__code__ == code:
-                return name
-    
-    return func_name
+def _get_function_name(code) -> str:
+    # '<module>' frames are reported as-is: there is no function object
+    # whose __code__ is the module's code to take a better name from.
+    return code.co_name
+
+
+def _get_code_info(code) -> tuple[str, str, str]:
+    filepath = code.co_filename
+    info = _code_info_cache.get(code)
+    if info is None or info[0] != filepath:
+        info = _code_info_cache[code] = (filepath, _get_relative_path(filepath), _get_function_name(code))
+    return info
+
+
+def _describe_exception(exc_type, exc_value) -> tuple[str, str]:
+    # Runs inside the tracer, where an exception escaping a user-defined
+    # __str__ would switch tracing off.
+    try:
+        message = str(exc_value)
+    except Exception:
+        message = "<exception str() failed>"
+    return exc_type.__name__, message
 
 
 def _should_trace(filepath: str) -> bool:
-    abspath = os.path.abspath(filepath)
-    
-    if abspath == _backtrace_file:
+    # co_filename is already absolute for anything imported from a file, so
+    # plain string checks are enough; no os.path.abspath per file.
+    if filepath == _backtrace_file:
         return False
     
-    if 'site-packages' in abspath:
+    if _find_package_dir(filepath):
         return False
-    if 'dist-packages' in abspath:
-        return False
-    if sys.prefix in abspath and _cwd not in abspath:
+    if filepath.startswith(_CWD_PREFIX):
+        return True
+    if filepath.startswith(_PREFIX_DIR):
         return False
     
     return True
 
 
 class _TraceContext:
-    def __init__(self, target_code, log_file: Optional[str] = None, return_trace: bool = False, use_rich: bool = True):
-        self.target_code = target_code
-        self.log_file = log_file
-        self.return_trace = return_trace
-        self.use_rich = use_rich
-        self.events = []
+    def __init__(self):
+        # Each event is a kind plus an index into _frame_table, which holds
+        # the (rel_path, lineno, func_name) shown for it. Rows repeat heavily
+        # (a helper called in a loop), so they are stored once and shared.
+        self._ev_kind = array('b')
+        self._ev_frame = array('i')
+        self._ev_exc: dict[int, tuple] = {}
+        self._frame_keys: dict[tuple, int] = {}
+        # Code objects whose id() appears in _frame_keys, held for the life
+        # of this trace so those ids can't be reused by other code.
+        self._pinned_codes: dict[int, Any] = {}
+        self._frame_table: list[tuple[str, int, str]] = []
         self.exception_info = None
-        self.started = False
-        self.root_frame = None
+        # id() of the decorator wrapper's frame; the traced function is its
+        # direct child. Only the id is kept so the context doesn't hold the
+        # frame (and through it the wrapper's locals) alive.
+        self.entry_frame_id = None
+        self._trace_decision_cache: dict[str, bool] = {}
         
     def trace_func(self, frame, event, arg):
+        # Called by the interpreter for every traced call and return. Cache
+        # hits are handled inline; helpers only run on a miss, since an
+        # extra Python call costs about as much as the lookup itself.
         code = frame.f_code
-        filepath = code.co_filename
-        
-        if not _should_trace(filepath):
-            return self.trace_func
-        
-        if not self.started and code == self.target_code:
-            self.started = True
-            self.root_frame = frame
-        
-        if not self.started:
-            return self.trace_func
-        
-        lineno = frame.f_lineno
-        func_name = _get_function_name(frame)
-        rel_path = _get_relative_path(filepath)
         
         if event == 'call':
-            if frame.f_back and frame != self.root_frame:
-                caller_lineno = frame.f_back.f_lineno
-                caller_path = _get_relative_path(frame.f_back.f_code.co_filename)
-                self.events.append(('call', caller_path, caller_lineno, func_name, None))
+            filepath = code.co_filename
+            decision = self._trace_decision_cache.get(filepath)
+            if decision is None:
+                decision = self._trace_decision_cache[filepath] = _should_trace(filepath)
+            if not decision:
+                # No local tracer: this frame's return/exception events are
+                # never delivered, so later events need no filtering.
+                return None
+            
+            # Only call/return/exception are handled; skip per-line events.
+            frame.f_trace_lines = False
+            
+            # Frame keys use id(code); every code object in a key is pinned
+            # in _pinned_codes when the key is first added.
+            caller = frame.f_back
+            if id(caller) != self.entry_frame_id:
+                caller_code = caller.f_code
+                key = (id(code), id(caller_code), caller.f_lasti)
+                frame_id = self._frame_keys.get(key)
+                if frame_id is None:
+                    frame_id = self._add_call_site(key, code, caller)
             else:
-                self.events.append(('call', rel_path, lineno, func_name, None))
+                frame_id = self._frame_id(code, code.co_firstlineno)
+            self._ev_kind.append(_CALL)
+            self._ev_frame.append(frame_id)
             
         elif event == 'return':
-            self.events.append(('return', rel_path, lineno, func_name, None))
+            # Return rows only show the file, so the line isn't resolved.
+            frame_id = self._frame_keys.get((id(code), 0))
+            if frame_id is None:
+                frame_id = self._frame_id(code, 0)
+            self._ev_kind.append(_RETURN)
+            self._ev_frame.append(frame_id)
                 
         elif event == 'exception':
-            exc_type, exc_value, exc_tb = arg
-            self.exception_info = (exc_type, exc_value, rel_path, lineno, func_name)
-            self.events.append(('exception', rel_path, lineno, func_name, (exc_type, exc_value)))
+            # Keep only the rendered name and message: the exception object
+            # references its traceback and every frame on it.
+            exc_name, exc_msg = _describe_exception(arg[0], arg[1])
+            lineno = frame.f_lineno
+            frame_id = self._frame_id(code, lineno)
+            rel_path, _, func_name = self._frame_table[frame_id]
+            self.exception_info = (exc_name, exc_msg, rel_path, lineno, func_name)
+            self._ev_exc[len(self._ev_kind)] = (exc_name, exc_msg)
+            self._ev_kind.append(_EXCEPTION)
+            self._ev_frame.append(frame_id)
         
         return self.trace_func
     
-    def _build_tree(self, is_failure: bool = False) -> Tree:
-        if not self.events:
-            return Tree("No events captured")
+    def _frame_id(self, code, lineno: int) -> int:
+        key = (id(code), lineno)
+        frame_id = self._frame_keys.get(key)
+        if frame_id is None:
+            _, rel_path, func_name = _get_code_info(code)
+            self._pinned_codes[id(code)] = code
+            frame_id = self._add_frame(key, rel_path, lineno, func_name)
+        return frame_id
+    
+    def _add_call_site(self, key: tuple, code, caller) -> int:
+        func_name = _get_code_info(code)[2]
+        caller_code = caller.f_code
+        caller_path = _get_code_info(caller_code)[1]
+        self._pinned_codes[id(code)] = code
+        self._pinned_codes[id(caller_code)] = caller_code
+        # Only reached on a _frame_keys miss, so each call site decodes its
+        # line once per context.
+        return self._add_frame(key, caller_path, caller.f_lineno, func_name)
+    
+    def _add_frame(self, key: tuple, rel_path: str, lineno: int, func_name: str) -> int:
+        frame_id = self._frame_keys[key] = len(self._frame_table)
+        self._frame_table.append((rel_path, lineno, func_name))
+        return frame_id
+    
+    def _iter_events(self, start: int = 0):
+        frame_table = self._frame_table
+        ev_exc = self._ev_exc
+        for i in range(start, len(self._ev_kind)):
+            filepath, lineno, func_name = frame_table[self._ev_frame[i]]
+            yield self._ev_kind[i], filepath, lineno, func_name, ev_exc.get(i)
+    
+    def _build_tree(self, is_failure: bool = False) -> "Text":
+        from rich.text import Text
         
-        first_event = self.events[0]
-        root_label = f"[cyan]↳[/cyan] {first_event[1]}:{first_event[2]} [yellow]({first_event[3]})[/yellow]"
-        tree = Tree(root_label)
+        if not self._ev_kind:
+            return Text("No events captured")
         
-        stack = [tree]
+        # One pass to (depth, label) rows, nested the way rich's Tree would
+        # nest them; the guides are then drawn by hand into Text rows
+        # instead of allocating a Tree node per event.
+        root_path, root_lineno, root_func = self._frame_table[self._ev_frame[0]]
+        rows = [(0, f"[cyan]↳[/cyan] {root_path}:{root_lineno} [yellow]({root_func})[/yellow]")]
+        depth = 0
         
-        for i, (event_type, filepath, lineno, func_name, exc_info) in enumerate(self.events[1:], 1):
-            if event_type == 'call':
-                label = f"[cyan]↳[/cyan] {filepath}:{lineno} [yellow]({func_name})[/yellow]"
-                node = stack[-1].add(label)
-                stack.append(node)
-            elif event_type == 'return':
-                label = f"[green]↰[/green] {filepath} [yellow]({func_name})[/yellow]"
-                if len(stack) > 1:
-                    stack[-1].add(label)
-                    stack.pop()
-            elif event_type == 'exception':
-                exc_type, exc_value = exc_info
+        for event_type, filepath, lineno, func_name, exc_info in self._iter_events(1):
+            if event_type == _CALL:
+                depth += 1
+                rows.append((depth, f"[cyan]↳[/cyan] {filepath}:{lineno} [yellow]({func_name})[/yellow]"))
+            elif event_type == _RETURN:
+                if depth > 0:
+                    rows.append((depth + 1, f"[green]↰[/green] {filepath} [yellow]({func_name})[/yellow]"))
+                    depth -= 1
+            elif event_type == _EXCEPTION:
+                exc_name, exc_msg = exc_info
                 if is_failure:
-                    label = f"[red]✗[/red] {filepath}:{lineno} [yellow]({func_name})[/yellow] [red]<-- EXCEPTION: {exc_type.__name__}: {exc_value}[/red]"
+                    label = f"[red]✗[/red] {filepath}:{lineno} [yellow]({func_name})[/yellow] [red]<-- EXCEPTION: {exc_name}: {exc_msg}[/red]"
                 else:
-                    label = f"[yellow]⚠[/yellow] {filepath}:{lineno} [yellow]({func_name})[/yellow] [dim]<-- handled exception: {exc_type.__name__}: {exc_value}[/dim]"
-                stack[-1].add(label)
+                    label = f"[yellow]⚠[/yellow] {filepath}:{lineno} [yellow]({func_name})[/yellow] [dim]<-- handled exception: {exc_name}: {exc_msg}[/dim]"
+                rows.append((depth + 1, label))
+        
+        # A row is the last of its siblings if no later row sits at the same
+        # depth before the tree climbs back above it.
+        is_last = [False] * len(rows)
+        sibling_after = []
+        for i in range(len(rows) - 1, -1, -1):
+            row_depth = rows[i][0]
+            del sibling_after[row_depth + 1:]
+            sibling_after.extend([False] * (row_depth + 1 - len(sibling_after)))
+            is_last[i] = not sibling_after[row_depth]
+            sibling_after[row_depth] = True
         
-        return tree
+        # Each label is parsed on its own, as Tree did, so unbalanced markup
+        # in one exception message or path can't style the rows after it.
+        lines = []
+        guides = []
+        for (row_depth, label), last in zip(rows, is_last):
+            if row_depth == 0:
+                lines.append(Text.from_markup(label))
+                continue
+            del guides[row_depth - 1:]
+            lines.append(Text("".join(guides) + ("└── " if last else "├── ")) + Text.from_markup(label))
+            guides.append("    " if last else "│   ")
+        
+        return Text("\n").join(lines)
     
     def _format_plain(self, status: str, is_failure: bool = False) -> str:
-        lines = []
+        buffer = io.StringIO()
+        write = buffer.write
+        
+        if is_failure and self.exception_info:
+            exc_name, exc_msg, rel_path, lineno, func_name = self.exception_info
+            write("EXCEPTION: %s: %s at %s:%d\n" % (exc_name, exc_msg, rel_path, lineno))
+        elif self._ev_kind:
+            root_path, root_lineno, _ = self._frame_table[self._ev_frame[0]]
+            write("EXECUTION TRACE (no exception) at %s:%d\n" % (root_path, root_lineno))
+        else:
+            write("EXECUTION TRACE (no exception)\n")
+        write("=== BACKTRACE ===\n")
+        
         depth = 0
         
-        for event_type, filepath, lineno, func_name, exc_info in self.events:
+        for event_type, filepath, lineno, func_name, exc_info in self._iter_events():
             indent = "    " * depth
             
-            if event_type == 'call':
-                lines.append(f"{indent}↳ {filepath}:{lineno} ({func_name})")
+            if event_type == _CALL:
+                write("%s↳ %s:%d (%s)\n" % (indent, filepath, lineno, func_name))
                 depth += 1
-            elif event_type == 'return':
+            elif event_type == _RETURN:
                 depth -= 1
                 indent = "    " * depth
-                lines.append(f"{indent}↰ {filepath} ({func_name})")
-            elif event_type == 'exception':
-                exc_type, exc_value = exc_info
+                write("%s↰ %s (%s)\n" % (indent, filepath, func_name))
+            elif event_type == _EXCEPTION:
+                exc_name, exc_msg = exc_info
                 if is_failure:
-                    lines.append(f"{indent}✗ {filepath}:{lineno} ({func_name}) <-- EXCEPTION HERE: {exc_type.__name__}: {exc_value}")
+                    write("%s✗ %s:%d (%s) <-- EXCEPTION HERE: %s: %s\n" % (indent, filepath, lineno, func_name, exc_name, exc_msg))
                 else:
-                    lines.append(f"{indent}⚠ {filepath}:{lineno} ({func_name}) (handled exception: {exc_type.__name__})")
+                    write("%s⚠ %s:%d (%s) (handled exception: %s)\n" % (indent, filepath, lineno, func_name, exc_name))
         
-        if is_failure and self.exception_info:
-            exc_type, exc_value, rel_path, lineno, func_name = self.exception_info
-            header = f"EXCEPTION: {exc_type.__name__}: {exc_value} at {rel_path}:{lineno}"
-        else:
-            if self.events:
-                first = self.events[0]
-                header = f"EXECUTION TRACE (no exception) at {first[1]}:{first[2]}"
-            else:
-                header = "EXECUTION TRACE (no exception)"
+        write("=================\n")
+        write("STATUS: %s" % (status,))
         
-        output = [
-            header,
-            "=== BACKTRACE ===",
-            *lines,
-            "=================",
-            f"STATUS: {status}"
-        ]
-        return "\n".join(output)
+        return buffer.getvalue()
     
     def format_trace(self, status: str, is_failure: bool = False):
-        if not self.use_rich:
-            return self._format_plain(status, is_failure)
-        
         if is_failure and self.exception_info:
-            exc_type, exc_value, rel_path, lineno, func_name = self.exception_info
-            title = f"[red bold]EXCEPTION: {exc_type.__name__}[/red bold]"
-            subtitle = f"{exc_value} at {rel_path}:{lineno}"
+            exc_name, exc_msg, rel_path, lineno, func_name = self.exception_info
+            title = f"[red bold]EXCEPTION: {exc_name}[/red bold]"
+            subtitle = f"{exc_msg} at {rel_path}:{lineno}"
             status_color = "red"
         else:
             title = "[green bold]EXECUTION TRACE[/green bold]"
             subtitle = "no exception" if not self.exception_info else "exception handled"
             status_color = "green"
         
+        from rich.panel import Panel
+        
         tree = self._build_tree(is_failure)
         
         return Panel(
@@ -187,19 +366,35 @@ class _TraceContext:
             border_style=status_color,
             padding=(1, 2)
         )
-    
-    def output_trace(self, trace_output):
-        if self.return_trace:
-            return trace_output if isinstance(trace_output, str) else str(trace_output)
-        elif self.log_file:
-            content = trace_output if isinstance(trace_output, str) else str(trace_output)
-            with open(self.log_file, 'a') as f:
-                f.write(content + "\n")
-        else:
-            if self.use_rich and not isinstance(trace_output, str):
-                _console.print(trace_output)
-            else:
-                print(trace_output)
+
+
+def _make_reporter(
+    log_file: Optional[str],
+    return_trace: bool,
+    use_rich: bool
+) -> Callable[[_TraceContext, str, bool], Optional[str]]:
+    # The output flags are fixed when a function is decorated, so resolve
+    # them once here instead of re-checking them on every traced call.
+    # Returned and logged traces are always plain text: rendering a rich
+    # panel to a string runs the whole layout engine for nothing useful.
+    if return_trace:
+        def report(ctx, status, is_failure):
+            return ctx._format_plain(status, is_failure)
+    elif log_file:
+        def report(ctx, status, is_failure):
+            # Format outside the handle's lock; the entry goes out in one write.
+            _LogFileRegistry.write_entry(log_file, ctx._format_plain(status, is_failure) + "\n")
+    elif use_rich:
+        # Load rich now rather than on the first report, which may run
+        # while an enclosing trace is active.
+        _get_console()
+        
+        def report(ctx, status, is_failure):
+            _get_console().print(ctx.format_trace(status, is_failure))
+    else:
+        def report(ctx, status, is_failure):
+            print(ctx._format_plain(status, is_failure))
+    return report
 
 
 def trace_calls(
@@ -209,29 +404,36 @@ def trace_calls(
     use_rich: bool = True
 ):
     def decorator(func: Callable) -> Callable:
+        report = _make_reporter(log_file, return_trace, use_rich)
+        
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            ctx = _TraceContext(func.__code__, log_file, return_trace, use_rich)
+            ctx = _TraceContext()
+            ctx.entry_frame_id = id(sys._getframe(0))
             
             old_trace = sys.gettrace()
             sys.settrace(ctx.trace_func)
             
+            # Report with tracing suspended entirely: restoring old_trace
+            # first would let an enclosing trace record the formatting.
             try:
                 result = func(*args, **kwargs)
-                
+            except BaseException:
+                sys.settrace(None)
+                try:
+                    report(ctx, "FAIL", True)
+                finally:
+                    sys.settrace(old_trace)
+                raise
+            
+            sys.settrace(None)
+            try:
                 if trace_on_success:
-                    trace_output = ctx.format_trace("PASS", is_failure=False)
-                    ctx.output_trace(trace_output)
-                
-                return result
-                
+                    report(ctx, "PASS", False)
             finally:
                 sys.settrace(old_trace)
-                
-                exc_info = sys.exc_info()
-                if exc_info[0] is not None:
-                    trace_output = ctx.format_trace("FAIL", is_failure=True)
-                    ctx.output_trace(trace_output)
+            
+            return result
         
         return wrapper
     
@@ -261,6 +463,18 @@ def run_and_log_backtrace(
     return decorated(*args, **kwargs)
 
 
+def _print_warning_panel(warning_type: str, message: str, rel_path: str, lineno: int) -> None:
+    from rich.panel import Panel
+    
+    _get_console().print(Panel(
+        f"[yellow]↳[/yellow] {rel_path}:{lineno} (warning_site)",
+        title=f"[yellow bold]WARNING: {warning_type}[/yellow bold]",
+        subtitle=message,
+        border_style="yellow",
+        padding=(1, 2)
+    ))
+
+
 def log_warning(
     warning: Warning,
     log_file: Optional[str] = None,
@@ -275,37 +489,25 @@ def log_warning(
     lineno = frame.f_lineno
     rel_path = _get_relative_path(filepath)
     
-    if use_rich:
-        panel = Panel(
-            f"[yellow]↳[/yellow] {rel_path}:{lineno} (warning_site)",
-            title=f"[yellow bold]WARNING: {warning_type}[/yellow bold]",
-            subtitle=message,
-            border_style="yellow",
-            padding=(1, 2)
-        )
-        
-        if return_trace:
-            return str(panel)
-        elif log_file:
-            with open(log_file, 'a') as f:
-                f.write(str(panel) + "\n")
-        else:
-            _console.print(panel)
+    # Only the console gets a rich panel; str() of a Panel isn't its
+    # rendering, so returned and logged warnings are always plain text.
+    if use_rich and not (return_trace or log_file):
+        _untraced(_print_warning_panel, warning_type, message, rel_path, lineno)
+        return None
+    
+    header = f"WARNING: {warning_type}: {message} at {rel_path}:{lineno}"
+    output = [
+        header,
+        "=== BACKTRACE ===",
+        f"↳ {rel_path}:{lineno} (warning_site)",
+        "=================",
+        "STATUS: WARNING"
+    ]
+    trace_str = "\n".join(output)
+    
+    if return_trace:
+        return trace_str
+    elif log_file:
+        _LogFileRegistry.write_entry(log_file, trace_str + "\n")
     else:
-        header = f"WARNING: {warning_type}: {message} at {rel_path}:{lineno}"
-        output = [
-            header,
-            "=== BACKTRACE ===",
-            f"↳ {rel_path}:{lineno} (warning_site)",
-            "=================",
-            "STATUS: WARNING"
-        ]
-        trace_str = "\n".join(output)
-        
-        if return_trace:
-            return trace_str
-        elif log_file:
-            with open(log_file, 'a') as f:
-                f.write(trace_str + "\n")
-        else:
-            print(trace_str)
\ No newline at end of file
+        print(trace_str)
\ No newline at end of file